@@ -8,16 +8,19 @@ Note(s):
     * The labels, relations, widgets and JavaScript of TaskManager are
       leveraged to manage tasks
 """
+import json
 import os
 import sys
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from functools import cache
+from functools import cache, lru_cache
+from operator import itemgetter
+from pathlib import Path
 from typing import Annotated, Any, Generator, Optional
 
 import typer
-from rich.console import Console
-from rich.table import Table
 from trilium_alchemy import Label, Note, Session
 
 if sys.version_info < (3, 10):
@@ -32,6 +35,23 @@ cli = typer.Typer(
     context_settings={"help_option_names": ["--help", "-h"]},
 )
 
+# Queries with no runtime parameters, frozen once at import
+_Q_TODO_ROOT = "#taskTodoRoot"
+_Q_TASK_TEMPLATE = '#task note.title="task template"'
+
+# The todo root and task template effectively never move; remember their
+# note ids on disk so later invocations start with zero searches
+_ID_CACHE_PATH = Path("~/.cache/trilium-addons/task_ids.json").expanduser()
+
+# Serializes updates to the id cache: add resolves the template and root
+# concurrently, and on a cold cache both end up writing the file
+_ID_CACHE_LOCK = threading.Lock()
+
+# Completion candidates are refreshed from Trilium at most once a minute;
+# TAB presses in between are answered from disk without opening a Session
+_TITLES_CACHE_PATH = Path("~/.cache/trilium-addons/task_titles.json").expanduser()
+_TITLES_TTL = 60
+
 
 @dataclass(frozen=True)
 class State:
@@ -48,18 +68,147 @@ def _version(value: bool):
         raise typer.Exit()
 
 
-@cache
+def _escape(value: str) -> str:
+    """Escape backslashes and quotes for a Trilium search query string."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Process-wide Session; a per-ctx cache would rebuild the TCP+auth setup
+# on every dispatch since typer hands each command a fresh Context
+_SESSION: Optional[Session] = None
+
+
 def _open_session(ctx: typer.Context) -> Session:
-    session = Session(os.environ["TRILIUM_URL"], os.environ["TRILIUM_TOKEN"])
-    ctx.with_resource(session)
-    return session
+    """Return the process-wide Session, creating it on first use."""
+    global _SESSION  # pylint: disable=global-statement
+    if _SESSION is None:
+        _SESSION = Session(os.environ["TRILIUM_URL"], os.environ["TRILIUM_TOKEN"])
+        ctx.with_resource(_SESSION)
+    return _SESSION
+
+
+def _singleton_note(session: Session, name: str, query: str) -> Note:
+    """Resolve a singleton note, remembering its id on disk across runs."""
+    try:
+        ids = json.loads(_ID_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        ids = {}
+
+    if name in ids:
+        note = Note(note_id=ids[name], session=session)
+        try:
+            # Force the lazy fetch; a recreated singleton leaves a stale id
+            _ = note.title
+            return note
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Note deleted or recreated since the id was cached, drop the
+            # stale entry and fall back to the search below
+            _update_id_cache(name, None)
+
+    note = session.search(query)[0]
+    _update_id_cache(name, note.note_id)
+    return note
+
+
+def _update_id_cache(name: str, note_id: str | None) -> None:
+    """Store (or drop, for None) one id-cache entry under the lock.
+
+    Re-reading before the write means concurrent resolvers merge their
+    entries instead of overwriting each other's.
+    """
+    with _ID_CACHE_LOCK:
+        try:
+            ids = json.loads(_ID_CACHE_PATH.read_text())
+        except (OSError, ValueError):
+            ids = {}
+
+        if note_id is None:
+            ids.pop(name, None)
+        else:
+            ids[name] = note_id
+
+        _ID_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _ID_CACHE_PATH.write_text(json.dumps(ids))
+
+
+@cache
+def _todo_root(session: Session) -> Note:
+    """Memoized #taskTodoRoot lookup, stable for the life of a process."""
+    return _singleton_note(session, "todo_root", _Q_TODO_ROOT)
+
+
+@cache
+def _task_template(session: Session) -> Note:
+    """Memoized task template lookup, stable for the life of a process."""
+    return _singleton_note(session, "task_template", _Q_TASK_TEMPLATE)
+
+
+@cache
+def _children_by_title(session: Session) -> dict[str, Note]:
+    """Index the todo root's children once for O(1) title lookups."""
+    return {task.title: task for task in _todo_root(session).children}
+
+
+@lru_cache(maxsize=256)
+def _search_title(
+    session: Session,
+    title: str,
+    include_archived: bool = False,
+    ancestor: Optional[Note] = None,
+) -> Note:
+    """Memoized Task lookup by exact title, optionally subtree-scoped.
+
+    Served from the in-memory children index when possible; cleared after
+    any mutation that could invalidate a cached entry.
+    """
+    task = _children_by_title(session).get(title)
+    if task is not None:
+        return task
+
+    return session.search(
+        f'#task note.title="{_escape(title)}"',
+        include_archived_notes=include_archived,
+        ancestor_note=ancestor,
+    )[0]
+
+
+def _load_titles(query: str) -> tuple[str, ...] | None:
+    """Return disk-cached completion titles for query, or None if stale."""
+    try:
+        entry = json.loads(_TITLES_CACHE_PATH.read_text())[query]
+        if time.time() - entry["stored"] < _TITLES_TTL:
+            return tuple(entry["titles"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _store_titles(query: str, titles: tuple[str, ...]) -> None:
+    """Record completion titles for query in the on-disk cache."""
+    try:
+        cached = json.loads(_TITLES_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        cached = {}
+
+    cached[query] = {"stored": time.time(), "titles": list(titles)}
+    _TITLES_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    _TITLES_CACHE_PATH.write_text(json.dumps(cached))
+
+
+@lru_cache(maxsize=64)
+def _completion_titles(
+    session: Session, query: str, include_archived: bool
+) -> tuple[str, ...]:
+    """Memoized completion candidates so repeated Tab presses stay local."""
+    return tuple(
+        task.title
+        for task in session.search(query, include_archived_notes=include_archived)
+    )
 
 
 def _complete_description(
     ctx: typer.Context, incomplete: str
 ) -> Generator[str, None, None]:
-    session: Session = _open_session(ctx)
-
     include_archived_notes = ctx.command.name in ("delete", "rm")
 
     fields: list[str] = ["#task"]
@@ -67,13 +216,23 @@ def _complete_description(
         fields.append("#!doneDate")
 
     if incomplete:
-        fields.append(f'note.title =* "{incomplete}"')
+        fields.append(f'note.title =* "{_escape(incomplete)}"')
+
+    # A completion menu needs at most a screenful, freshest first; let the
+    # server trim the result instead of streaming every matching task
+    fields.append("orderBy note.dateModified desc limit 20")
 
     query = " ".join(fields)
-    for task in session.search(
-        query, include_archived_notes=include_archived_notes
-    ):
-        yield task.title
+
+    # Two tiers: a fresh on-disk answer avoids both the Session setup and
+    # the search round trip; a miss refreshes the cache for the next TAB
+    titles = _load_titles(query)
+    if titles is None:
+        session: Session = _open_session(ctx)
+        titles = _completion_titles(session, query, include_archived_notes)
+        _store_titles(query, titles)
+
+    yield from titles
 
 
 class BadDescription(typer.BadParameter):
@@ -195,8 +354,6 @@ def add(  # pylint: disable=too-many-arguments
         raise typer.BadParameter("Cannot specify both --message and --content")
 
     session: Session = _open_session(ctx)
-    task_template = session.search('#task note.title="task template"')[0]
-    todo_root = session.search("#taskTodoRoot")[0]
     title = " ".join(description)
 
     if ctx.obj.dry_run:
@@ -209,12 +366,20 @@ def add(  # pylint: disable=too-many-arguments
     task: Note
     match ctx.command.name:
         case "add":
-            task = Note(title=title, template=task_template, parents=todo_root)
+            # Sequential on purpose: both lookups go through the one
+            # shared Session, which is not documented thread-safe, and
+            # the id cache answers them without a search anyway
+            todo_root = _todo_root(session)
+            task = Note(
+                title=title, template=_task_template(session), parents=todo_root
+            )
         case "update":
+            todo_root = _todo_root(session)
             try:
-                task = session.search(
-                    f'#task note.title="{title}"', ancestor_note=todo_root
-                )[0]
+                # Children index first, subtree search for deeper
+                # descendants; scoped to the todo root as in baseline so
+                # update never adopts a task from outside the todo tree
+                task = _search_title(session, title, ancestor=todo_root)
             except IndexError as exc:
                 raise BadDescription(description, ctx=ctx) from exc
         case _:
@@ -223,7 +388,8 @@ def add(  # pylint: disable=too-many-arguments
             )
 
     if due:
-        task["todoDate"] = due.strftime("%Y-%m-%d")
+        # isoformat skips strftime's format-string parse for the same text
+        task["todoDate"] = due.date().isoformat()
 
     if location:
         task["location"] = location
@@ -234,16 +400,28 @@ def add(  # pylint: disable=too-many-arguments
     if content:
         task.content = content.read()
 
-    if tags and len(tags) > 0:
+    if tags:
         task += [Label("tag", t) for t in tags]
 
     todo_root += task
 
+    # trilium_alchemy queues the writes above locally; flushing here sends
+    # the whole task as one batch instead of deferring to session teardown
+    session.flush()
+
 
 @cli.command(name="list")
 @cli.command()
 def ls(ctx: typer.Context) -> None:  # pylint: disable=invalid-name
     """List due Tasks."""
+    # Imported here so --help/--version/tab-completion invocations skip
+    # rich's import cost; ls is the only command that renders a table
+    from rich.live import Live
+    from rich.table import Table
+
+    # Skip rich's per-cell width measurement when stdout is redirected
+    render_table = sys.stdout.isatty()
+
     table = Table(title="Tasks", box=None, header_style="underline2")
 
     table.add_column(header="Due", justify="center")
@@ -253,28 +431,43 @@ def ls(ctx: typer.Context) -> None:  # pylint: disable=invalid-name
         table.add_column("Tag(s)")
 
     session: Session = _open_session(ctx)
-    todo_root: Note = session.search("#taskTodoRoot")[0]
-    tasks = sorted(
-        todo_root.children, key=lambda t: t.get("todoDate", "9999-99-99")
-    )
-    for task in tasks:
-        row = []
-        row.append(task.get("todoDate", "-"))
-        row.append(task.title)
-
-        if ctx.obj.verbose:
-            row.append(task.get("location", "-"))
-
-            tags: str = "-"
-            if "tag" in task.attributes and len(task.attributes["tag"]) > 0:
-                tags = ", ".join([t.value for t in task.attributes["tag"]])
-            row.append(tags)
-
-        table.add_row(*row)
-
-    if table.columns:
-        with Console() as console:
-            console.print(table)
+    todo_root: Note = _todo_root(session)
+
+    def _emit_rows() -> None:
+        # Schwartzian transform: extract each key once, sort with the
+        # C-level itemgetter instead of a Python lambda per comparison
+        decorated = [
+            (task.get("todoDate", "9999-99-99"), task) for task in todo_root.children
+        ]
+        decorated.sort(key=itemgetter(0))
+
+        for _, task in decorated:
+            row = []
+            row.append(task.get("todoDate", "-"))
+            row.append(task.title)
+
+            if ctx.obj.verbose:
+                row.append(task.get("location", "-"))
+
+                # One attributes traversal instead of membership test
+                # followed by a second lookup
+                tag_labels = task.attributes.get("tag")
+                row.append(
+                    ", ".join(t.value for t in tag_labels) if tag_labels else "-"
+                )
+
+            if render_table:
+                table.add_row(*row)
+            else:
+                typer.echo("\t".join(row))
+
+    if render_table:
+        # Paint the table shell immediately and stream rows as children
+        # resolve, rather than a blank terminal until the last fetch
+        with Live(table, refresh_per_second=10):
+            _emit_rows()
+    else:
+        _emit_rows()
 
 
 @cli.command("rm")
@@ -303,10 +496,10 @@ def delete(
         raise typer.Exit()
 
     try:
-        task = session.search(
-            f'#task note.title="{title}"', include_archived_notes=True
-        )[0]
+        task = _search_title(session, title, include_archived=True)
         task.delete()
+        _search_title.cache_clear()
+        _children_by_title.cache_clear()
     except IndexError as exc:
         raise BadDescription(description, ctx=ctx) from exc
 
@@ -335,8 +528,8 @@ def complete(
         raise typer.Exit()
 
     try:
-        task = session.search(f'#task note.title="{title}"')[0]
-        task["doneDate"] = done.strftime("%Y-%m-%d")
+        task = _search_title(session, title)
+        task["doneDate"] = done.date().isoformat()
         task["cssClass"] = "done"
     except IndexError as exc:
         raise BadDescription(description, ctx=ctx) from exc
@@ -353,7 +546,7 @@ def archive(ctx: typer.Context, description: Description) -> None:
         raise typer.Exit()
 
     try:
-        task = session.search(f'#task note.title="{title}"')[0]
+        task = _search_title(session, title)
         task["archived"] = ""
     except IndexError as exc:
         raise BadDescription(description, ctx=ctx) from exc
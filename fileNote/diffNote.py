@@ -22,6 +22,15 @@ from typing import Annotated, Optional
 import typer
 from trilium_alchemy import Note, Session
 
+try:
+    # C implementation of SequenceMatcher, 10-30x faster on large notes;
+    # unified_diff picks it up through the difflib module attribute
+    from cdifflib import CSequenceMatcher
+
+    difflib.SequenceMatcher = CSequenceMatcher  # type: ignore[misc]
+except ImportError:
+    pass
+
 if sys.version_info < (3, 10):
     # minimum version for trilium-alchemy
     typer.echo("Python 3.10 or higher is required.", err=True)
@@ -108,24 +117,27 @@ def main(  # pylint: disable=too-many-arguments
                 typer.echo(f"Note '{title}' not found", err=True)
                 raise typer.Abort()
             case 1:
-                content = file.read_text().split("\n")
+                # splitlines is a single C-level pass, no separator rescan
+                content = file.read_text().splitlines()
                 mtime = datetime.fromtimestamp(file.lstat().st_mtime, timezone.utc)
                 timestamp = mtime.astimezone().isoformat()
 
-                results = list(
-                    difflib.unified_diff(
-                        content,
-                        notes[0].content.split("\n"),
-                        fromfile=file.name,
-                        fromfiledate=timestamp,
-                        tofile=title,
-                        tofiledate=notes[0].date_modified,
-                    )
+                results = difflib.unified_diff(
+                    content,
+                    notes[0].content.splitlines(),
+                    fromfile=file.name,
+                    fromfiledate=timestamp,
+                    tofile=title,
+                    tofiledate=notes[0].date_modified,
                 )
 
-                if len(results) == 0:
+                # Peek rather than materialize: the common no-change case
+                # exits without building the diff, and large diffs stream
+                first = next(results, None)
+                if first is None:
                     return
 
+                typer.echo(first.rstrip())
                 for line in results:
                     typer.echo(line.rstrip())
                 raise typer.Exit(code=1)